@@ -30,6 +30,10 @@ __all__ = ['TrainableBase', 'CompositionalTrainableBase']
 
 T = TypeVar('T', bound='TrainableBase')
 
+# cached once at import: the switch never flips within a process, and
+# register_class runs for every (including dynamically generated) subclass
+_PROFILING = bool(os.environ.get('GNES_PROFILING', False))
+
 
 def register_all_class(cls2file_map: Dict, module_name: str):
     import importlib
@@ -106,7 +110,7 @@ class TrainableType(type):
         if cls.__name__ not in reg_cls_set:
             # print('reg class: %s' % cls.__name__)
             cls.__init__ = TrainableType._store_init_kwargs(cls.__init__)
-            if os.environ.get('GNES_PROFILING', False):
+            if _PROFILING:
                 for f_name in ['train', 'encode', 'add', 'query', 'index']:
                     if getattr(cls, f_name, None):
                         setattr(cls, f_name, profiling(getattr(cls, f_name)))
@@ -136,13 +140,18 @@ class TrainableType(type):
 
     @staticmethod
     def _store_init_kwargs(func):
+        # the signature of a given __init__ never changes at runtime, so
+        # introspect it once at class-creation time instead of on every
+        # construction (inspect.signature costs hundreds of microseconds)
+        taboo = {'self', 'args', 'kwargs'}
+        taboo.update(TrainableType.default_gnes_config.keys())
+        all_pars = inspect.signature(func).parameters
+        default_kwargs = {k: v.default for k, v in all_pars.items() if k not in taboo}
+        tmp_list = [k for k in all_pars.keys() if k not in taboo]
+
         @wraps(func)
         def arg_wrapper(self, *args, **kwargs):
-            taboo = {'self', 'args', 'kwargs'}
-            taboo.update(TrainableType.default_gnes_config.keys())
-            all_pars = inspect.signature(func).parameters
-            tmp = {k: v.default for k, v in all_pars.items() if k not in taboo}
-            tmp_list = [k for k in all_pars.keys() if k not in taboo]
+            tmp = default_kwargs.copy()
             # set args by aligning tmp_list with arg values
             for k, v in zip(tmp_list, args):
                 tmp[k] = v
@@ -174,9 +183,21 @@ class TrainableBase(metaclass=TrainableType):
 
     def __init__(self, *args, **kwargs):
         self.verbose = 'verbose' in kwargs and kwargs['verbose']
-        self.logger = set_logger(self.__class__.__name__, self.verbose)
+        self._logger = None
         self._post_init_vars = set()
 
+    @property
+    def logger(self):
+        # built lazily so that transient objects (e.g. those thrown away right
+        # after yaml parsing) never pay for handler setup
+        if self._logger is None:
+            self._logger = set_logger(self.__class__.__name__, self.verbose)
+        return self._logger
+
+    @logger.setter
+    def logger(self, value):
+        self._logger = value
+
     def _post_init_wrapper(self):
         if not getattr(self, 'name', None) and os.environ.get('GNES_WARN_UNNAMED_COMPONENT', '1') == '1':
             _id = str(uuid.uuid4()).split('-')[0]
@@ -224,14 +245,14 @@ class TrainableBase(metaclass=TrainableType):
 
     def __getstate__(self):
         d = dict(self.__dict__)
-        del d['logger']
+        d.pop('_logger', None)
         for k in self._post_init_vars:
             del d[k]
         return d
 
     def __setstate__(self, d):
         self.__dict__.update(d)
-        self.logger = set_logger(self.__class__.__name__, self.verbose)
+        self._logger = None
         try:
             self._post_init_wrapper()
         except ImportError as ex:
@@ -255,7 +276,9 @@ class TrainableBase(metaclass=TrainableType):
         if not f:
             f = tempfile.NamedTemporaryFile('w', delete=False, dir=os.environ.get('GNES_VOLUME', None)).name
         with open(f, 'wb') as fp:
-            pickle.dump(self, fp)
+            # highest protocol serializes large numpy members as whole buffers
+            # instead of the byte-wise default-protocol encoding
+            pickle.dump(self, fp, protocol=pickle.HIGHEST_PROTOCOL)
         self.logger.critical('model is serialized to %s' % f)
 
     @profiling
@@ -14,6 +14,12 @@
 #  limitations under the License.
 
 
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from itertools import islice
 from typing import List
 
 import numpy as np
@@ -21,6 +27,17 @@ import numpy as np
 from ..base import BaseTextEncoder
 from ...helper import batching, pooling_simple, as_numpy_array
 
+_tokenizer_per_process = None
+
+
+def _tokenize_in_worker(text: str) -> List[str]:
+    # runs in a pool worker, where the jieba model is built once per process
+    global _tokenizer_per_process
+    if _tokenizer_per_process is None:
+        from ...helper import Tokenizer
+        _tokenizer_per_process = Tokenizer()
+    return _tokenizer_per_process.tokenize(text)
+
 
 class Word2VecEncoder(BaseTextEncoder):
     is_trained = True
@@ -28,38 +45,330 @@ class Word2VecEncoder(BaseTextEncoder):
     def __init__(self, model_dir: str,
                  skiprows: int = 1,
                  dimension: int = 300,
-                 pooling_strategy: str = 'REDUCE_MEAN', *args, **kwargs):
+                 pooling_strategy: str = 'REDUCE_MEAN',
+                 tokenize_workers: int = None,
+                 parallel_tokenize_threshold: int = 256,
+                 cache_size: int = 100000,
+                 quantize: bool = False,
+                 bucket_size: int = 128,
+                 shared_memory_name: str = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.model_dir = model_dir
         self.skiprows = skiprows
         self.pooling_strategy = pooling_strategy
         self.dimension = dimension
+        self.tokenize_workers = tokenize_workers or os.cpu_count()
+        self.parallel_tokenize_threshold = parallel_tokenize_threshold
+        self.cache_size = cache_size
+        self.quantize = quantize
+        self.bucket_size = bucket_size
+        self.shared_memory_name = shared_memory_name
 
     def post_init(self):
         from ...helper import Tokenizer
-        count = 0
-        self.word2vec_df = {}
-        with open(self.model_dir, 'r') as f:
-            for line in f.readlines():
-                line = line.strip().split(' ')
-                if count < self.skiprows:
-                    count += 1
-                    continue
-                if len(line) > self.dimension:
-                    self.word2vec_df[line[0]] = np.array([float(i) for i in line[1:]], dtype=np.float32)
+        npy_path = self.model_dir + '.npy'
+        vocab_path = self.model_dir + '.vocab'
+        if self.shared_memory_name:
+            # attach to a segment filled once by load_shared() in the parent
+            # process; the bytes are never duplicated per worker
+            from multiprocessing import shared_memory
+            with open(vocab_path, 'r', encoding='utf8') as f:
+                self.vocab = {w.rstrip('\n'): idx + 1 for idx, w in enumerate(f)}
+            self._shm = shared_memory.SharedMemory(name=self.shared_memory_name)
+            self.embeddings = np.ndarray((len(self.vocab) + 1, self.dimension),
+                                         dtype=np.float32, buffer=self._shm.buf)
+        else:
+            self.embeddings = None
+            if os.path.exists(npy_path) and os.path.exists(vocab_path):
+                # memory-mapped load: startup becomes an mmap instead of a text
+                # parse, and forked workers share the matrix through the page cache
+                try:
+                    emb = np.load(npy_path, mmap_mode='r')
+                    with open(vocab_path, 'r', encoding='utf8') as f:
+                        vocab = {w.rstrip('\n'): idx + 1 for idx, w in enumerate(f)}
+                    if emb.shape != (len(vocab) + 1, self.dimension):
+                        raise ValueError('vocab/matrix size mismatch: %s words vs %s rows' %
+                                         (len(vocab), emb.shape))
+                    self.vocab, self.embeddings = vocab, emb
+                except (OSError, ValueError) as ex:
+                    self.logger.warning('binary cache next to "%s" is unreadable (%s), '
+                                        'falling back to the text parse' % (self.model_dir, ex))
+            if self.embeddings is None:
+                self.vocab, self.embeddings = self._parse_text_vectors(
+                    self.model_dir, self.skiprows, self.dimension)
+                try:
+                    self._write_bin(npy_path, vocab_path, self.vocab, self.embeddings)
+                except OSError as ex:
+                    self.logger.warning('can not write binary cache next to "%s" (%s), '
+                                        'will parse the text file again next time' % (self.model_dir, ex))
+
+        if self.quantize:
+            # symmetric per-row int8 quantization: keep only the int8 table plus a
+            # float32 scale per row, cutting table bytes by 4x; rows are
+            # dequantized on gather
+            scales = np.abs(self.embeddings).max(axis=1).astype(np.float32) / 127.0
+            scales[scales == 0] = 1.0
+            self.scales = scales
+            self.q_emb = np.round(self.embeddings / scales[:, None]).astype(np.int8)
+            self.embeddings = None
 
-        self.empty = np.zeros([self.dimension], dtype=np.float32)
         self.cn_tokenizer = Tokenizer()
+        self._tok_pool = None  # built lazily on the first large-enough batch
+        self._cache = OrderedDict()
+        self._token_ids_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._jit_pool = None
+        if not self.quantize:
+            self._jit_pool = self._build_jit_pool()
+            if self._jit_pool is not None:
+                # dummy call so the JIT compile cost is paid at load, not on the
+                # first request; must slice the real matrix so the compiled
+                # signature (e.g. read-only memmap) matches what encode passes
+                self._jit_pool(self.embeddings[:1],
+                               np.zeros(1, dtype=np.int32),
+                               np.array([0, 1], dtype=np.int64),
+                               np.zeros((1, self.dimension), dtype=np.float32))
+
+    @staticmethod
+    def _build_jit_pool():
+        try:
+            from numba import njit, prange
+        except ImportError:
+            return None
+
+        @njit(parallel=True, fastmath=True, cache=True)
+        def _pool_mean_jit(emb, flat_ids, offsets, out):  # pragma: no cover
+            # fused gather + accumulate: embedding rows are read once and summed
+            # straight into the (B, dim) output, one sentence per thread
+            dim = emb.shape[1]
+            for s in prange(len(offsets) - 1):
+                start, end = offsets[s], offsets[s + 1]
+                if start == end:
+                    continue
+                acc = out[s]
+                for k in range(start, end):
+                    row = emb[flat_ids[k]]
+                    for d in range(dim):
+                        acc[d] += row[d]
+                n = end - start
+                for d in range(dim):
+                    acc[d] /= n
+
+        return _pool_mean_jit
+
+    @staticmethod
+    def _parse_text_vectors(model_dir: str, skiprows: int, dimension: int):
+        # stream the file line-by-line instead of f.readlines(), which would hold
+        # the whole (often >1GB) vectors file in memory; header rows are skipped
+        # lazily and a large read buffer keeps the IO sequential
+        # first pass: a bare line count upper-bounds V without splitting each
+        # line into ~dim throwaway strings
+        with open(model_dir, 'r', buffering=1 << 20) as f:
+            num_lines = sum(1 for _ in islice(f, skiprows, None))
+
+        # one contiguous (V+1, dim) matrix instead of V tiny python-object arrays;
+        # row 0 is reserved as the zero vector for out-of-vocab tokens
+        vocab = {}
+        embeddings = np.zeros((num_lines + 1, dimension), dtype=np.float32)
+        row = 1
+        with open(model_dir, 'r', buffering=1 << 20) as f:
+            for line in islice(f, skiprows, None):
+                # isolate the word at the first space and hand the float block to
+                # np.fromstring, which parses in C: one allocation per line
+                # instead of ~dim; the parsed size check rejects malformed lines
+                word, _, rest = line.partition(' ')
+                vec = np.fromstring(rest, sep=' ', dtype=np.float32)
+                if vec.size == dimension:
+                    embeddings[row] = vec
+                    vocab[word] = row
+                    row += 1
+        # rows past the last valid line (header mismatches etc.) are trimmed off
+        return vocab, embeddings[:row]
+
+    @staticmethod
+    def _write_bin(npy_path: str, vocab_path: str, vocab, embeddings):
+        # write to pid-suffixed temp names and rename into place (atomic on
+        # POSIX), so cold-starting workers racing on the same cache never mmap
+        # a half-written file; the temp .npy keeps the suffix np.save expects
+        tmp_npy = '%s.%d.tmp.npy' % (npy_path, os.getpid())
+        tmp_vocab = '%s.%d.tmp' % (vocab_path, os.getpid())
+        np.save(tmp_npy, embeddings)
+        with open(tmp_vocab, 'w', encoding='utf8') as f:
+            # vocab preserves insertion order, which is the row order 1..V
+            f.writelines('%s\n' % w for w in vocab)
+        os.rename(tmp_npy, npy_path)
+        os.rename(tmp_vocab, vocab_path)
+
+    @classmethod
+    def load_shared(cls, model_dir: str, name: str = None,
+                    skiprows: int = 1, dimension: int = 300):
+        """
+        Fill a shared-memory segment with the embedding matrix, to be called once
+        in the parent process. Workers built with ``shared_memory_name=shm.name``
+        attach a view instead of owning a copy. The caller owns the returned
+        handle and must ``unlink()`` it on shutdown. Note that ``np.load`` with
+        ``mmap_mode='r'`` gives the same page-cache sharing without explicit
+        lifetime management; pick whichever fits the deployment.
+        """
+        from multiprocessing import shared_memory
+        npy_path = model_dir + '.npy'
+        vocab_path = model_dir + '.vocab'
+        if not (os.path.exists(npy_path) and os.path.exists(vocab_path)):
+            cls.convert_text_to_bin(model_dir, model_dir, skiprows, dimension)
+        emb = np.load(npy_path, mmap_mode='r')
+        shm = shared_memory.SharedMemory(create=True, size=emb.nbytes, name=name)
+        np.ndarray(emb.shape, dtype=emb.dtype, buffer=shm.buf)[:] = emb[:]
+        return shm
+
+    @classmethod
+    def convert_text_to_bin(cls, src: str, dst_prefix: str,
+                            skiprows: int = 1, dimension: int = 300):
+        """
+        One-time conversion of a text word2vec file into the binary
+        (dst_prefix.npy, dst_prefix.vocab) pair that :py:meth:`post_init` memory-maps
+        """
+        vocab, embeddings = cls._parse_text_vectors(src, skiprows, dimension)
+        cls._write_bin(dst_prefix + '.npy', dst_prefix + '.vocab', vocab, embeddings)
+
+    def _tokenize_batch(self, text: List[str]) -> List[List[str]]:
+        if len(text) < self.parallel_tokenize_threshold or self.tokenize_workers <= 1:
+            # process dispatch dominates on tiny batches, stay serial
+            return [self.cn_tokenizer.tokenize(sent) for sent in text]
+        if self._tok_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn, not fork: forking after the parallel numba runtime (or any
+            # other thread) has started in this process deadlocks the children
+            self._tok_pool = ProcessPoolExecutor(
+                max_workers=self.tokenize_workers,
+                mp_context=multiprocessing.get_context('spawn'))
+        chunksize = max(1, len(text) // (4 * self.tokenize_workers))
+        return list(self._tok_pool.map(_tokenize_in_worker, text, chunksize=chunksize))
+
+    def close(self):
+        super().close()
+        if getattr(self, '_tok_pool', None):
+            self._tok_pool.shutdown()
+            self._tok_pool = None
+        if getattr(self, '_shm', None):
+            self.embeddings = None
+            self._shm.close()  # the parent that created the segment unlinks it
+            self._shm = None
 
     @batching
     @as_numpy_array
     def encode(self, text: List[str], *args, **kwargs) -> np.ndarray:
-        # tokenize text
-        batch_tokens = [self.cn_tokenizer.tokenize(sent) for sent in text]
-        pooled_data = []
+        if not self.cache_size:
+            return self._encode_batch(text)
+
+        # repeated queries are served straight from the LRU cache; only the
+        # misses go through tokenization and pooling
+        keys = [hashlib.blake2b(sent.encode('utf8'), digest_size=16).digest() for sent in text]
+        results = [None] * len(text)
+        with self._cache_lock:
+            for i, k in enumerate(keys):
+                v = self._cache.get(k)
+                if v is not None:
+                    self._cache.move_to_end(k)
+                    results[i] = v
+        miss_idx = [i for i, r in enumerate(results) if r is None]
+        if miss_idx:
+            miss_vecs = self._encode_batch([text[i] for i in miss_idx])
+            with self._cache_lock:
+                for i, v in zip(miss_idx, miss_vecs):
+                    results[i] = v
+                    self._cache[keys[i]] = v
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return np.stack(results)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self._token_ids_cache.clear()
+
+    def _sent_to_ids(self, text: List[str]) -> List[np.ndarray]:
+        """
+        Map each sentence to its compact np.int32 token-id array, caching the ids
+        by sentence hash so re-encoding a static corpus skips tokenization
+        """
+        if not self.cache_size:
+            return [self._token_ids(tokens) for tokens in self._tokenize_batch(text)]
+
+        keys = [hashlib.blake2b(sent.encode('utf8'), digest_size=16).digest() for sent in text]
+        results = [None] * len(text)
+        with self._cache_lock:
+            for i, k in enumerate(keys):
+                v = self._token_ids_cache.get(k)
+                if v is not None:
+                    self._token_ids_cache.move_to_end(k)
+                    results[i] = v
+        miss_idx = [i for i, r in enumerate(results) if r is None]
+        if miss_idx:
+            miss_tokens = self._tokenize_batch([text[i] for i in miss_idx])
+            with self._cache_lock:
+                for i, tokens in zip(miss_idx, miss_tokens):
+                    results[i] = self._token_ids(tokens)
+                    self._token_ids_cache[keys[i]] = results[i]
+                while len(self._token_ids_cache) > self.cache_size:
+                    self._token_ids_cache.popitem(last=False)
+        return results
+
+    def _token_ids(self, tokens: List[str]) -> np.ndarray:
+        # hoist the bound method: saves two attribute lookups per token
+        get = self.vocab.get
+        return np.fromiter((get(token, 0) for token in tokens),
+                           dtype=np.int32, count=len(tokens))
+
+    def _encode_batch(self, text: List[str]) -> np.ndarray:
+        if not self.bucket_size or len(text) <= self.bucket_size:
+            return self._encode_bucket(text)
+
+        # process length-homogeneous buckets so the flat id/offset arrays of each
+        # bucket have predictable sizes, then restore the caller's order
+        order = np.argsort([len(sent) for sent in text], kind='stable')
+        results = [None] * len(text)
+        for bucket in np.array_split(order, -(-len(text) // self.bucket_size)):
+            for i, v in zip(bucket, self._encode_bucket([text[i] for i in bucket])):
+                results[i] = v
+        return np.stack(results)
+
+    def _encode_bucket(self, text: List[str]) -> np.ndarray:
+        # tokenize (or recall cached ids) and build one flat id array for a
+        # single (total_tokens, dim) gather instead of per-token dict lookups
+        sent_ids = self._sent_to_ids(text)
+        lengths = np.array([len(ids) for ids in sent_ids], dtype=np.int64)
+        flat_ids = np.concatenate(sent_ids)
+
+        if self.pooling_strategy != 'REDUCE_MEAN':
+            flat_vecs = self._gather(flat_ids)
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            return [pooling_simple(list(flat_vecs[offsets[b]:offsets[b + 1]]), self.pooling_strategy)
+                    for b in range(len(sent_ids))]
+
+        if self._jit_pool is not None:
+            # fused kernel: no (total_tokens, dim) intermediate is materialized
+            offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+            out = np.zeros((len(lengths), self.dimension), dtype=np.float32)
+            self._jit_pool(self.embeddings, flat_ids, offsets, out)
+            return out
+
+        return self._pool_mean(self._gather(flat_ids), lengths)
 
-        for tokens in batch_tokens:
-            _layer_data = [self.word2vec_df.get(token, self.empty) for token in tokens]
-            pooled_data.append(pooling_simple(_layer_data, self.pooling_strategy))
+    def _gather(self, ids: np.ndarray) -> np.ndarray:
+        if self.quantize:
+            return self.q_emb[ids].astype(np.float32) * self.scales[ids, None]
+        return self.embeddings[ids]
 
-        return pooled_data
+    @staticmethod
+    def _pool_mean(flat_vecs: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        if np.all(lengths > 0):
+            # tokens arrive in sentence order, so one segmented sum does it
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            sums = np.add.reduceat(flat_vecs, offsets, axis=0)
+        else:
+            # zero-length segments confuse reduceat; accumulate by sentence index
+            # instead, leaving empty sentences as the zero vector
+            sums = np.zeros((len(lengths), flat_vecs.shape[1]), dtype=np.float32)
+            sent_idx = np.repeat(np.arange(len(lengths)), lengths)
+            np.add.at(sums, sent_idx, flat_vecs)
+        return sums / (lengths[:, None] + 1e-10)
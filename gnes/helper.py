@@ -210,26 +210,33 @@ def get_perm(L, m):
     return reranked
 
 
+# profiling switches are read once at import time: they never change within a
+# process, and checking os.environ on every call is not free
+_PROFILING = bool(os.environ.get('GNES_PROFILING', False))
+_PROFILING_MEM = bool(os.environ.get('GNES_PROFILING_MEM', False))
+
+
 def time_profile(func):
+    if not _PROFILING:
+        # profiling is off: hand back the function untouched so there is no
+        # extra wrapper frame on the call stack
+        return func
+
     @wraps(func)
     def arg_wrapper(*args, **kwargs):
-        if os.environ.get('GNES_PROFILING', False):
-            start_t = time.perf_counter()
-            if os.environ.get('GNES_PROFILING_MEM', False):
-                start_mem = memory_usage()[0]
-            r = func(*args, **kwargs)
-            elapsed = time.perf_counter() - start_t
-            if os.environ.get('GNES_PROFILING_MEM', False):
-                end_mem = memory_usage()[0]
-            # level_prefix = ''.join('-' for v in inspect.stack() if v and v.index is not None and v.index >= 0)
-            level_prefix = ''
-            if os.environ.get('GNES_PROFILING_MEM', False):
-                mem_status = 'memory: %4.2fM -> %4.2fM' % (start_mem, end_mem)
-            else:
-                mem_status = ''
-            profile_logger.info('%s%s: %3.3fs. %s' % (level_prefix, func.__qualname__, elapsed, mem_status))
+        start_t = time.perf_counter()
+        if _PROFILING_MEM:
+            start_mem = memory_usage()[0]
+        r = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start_t
+        # level_prefix = ''.join('-' for v in inspect.stack() if v and v.index is not None and v.index >= 0)
+        level_prefix = ''
+        if _PROFILING_MEM:
+            end_mem = memory_usage()[0]
+            mem_status = 'memory: %4.2fM -> %4.2fM' % (start_mem, end_mem)
         else:
-            r = func(*args, **kwargs)
+            mem_status = ''
+        profile_logger.info('%s%s: %3.3fs. %s' % (level_prefix, func.__qualname__, elapsed, mem_status))
         return r
 
     return arg_wrapper
@@ -283,18 +290,18 @@ class NTLogger:
         self.context = context
         self.verbose = verbose
 
-    def info(self, msg, **kwargs):
-        print('I:%s:%s' % (self.context, msg), flush=True)
+    def info(self, msg, *args, **kwargs):
+        print('I:%s:%s' % (self.context, msg % args if args else msg), flush=True)
 
-    def debug(self, msg, **kwargs):
+    def debug(self, msg, *args, **kwargs):
         if self.verbose:
-            print('D:%s:%s' % (self.context, msg), flush=True)
+            print('D:%s:%s' % (self.context, msg % args if args else msg), flush=True)
 
-    def error(self, msg, **kwargs):
-        print('E:%s:%s' % (self.context, msg), flush=True)
+    def error(self, msg, *args, **kwargs):
+        print('E:%s:%s' % (self.context, msg % args if args else msg), flush=True)
 
-    def warning(self, msg, **kwargs):
-        print('W:%s:%s' % (self.context, msg), flush=True)
+    def warning(self, msg, *args, **kwargs):
+        print('W:%s:%s' % (self.context, msg % args if args else msg), flush=True)
 
 
 class TimeContext:
@@ -426,9 +433,11 @@ def batching(func: Callable[[Any], np.ndarray] = None, *,
                     return func(self, data, label, *args, **kwargs)
 
             if hasattr(self, 'logger'):
-                self.logger.info(
-                    'batching enabled for %s(). batch_size=%s\tnum_batch=%s\taxis=%s' % (
-                        func.__qualname__, b_size, num_batch, iter_axis))
+                # lazy %-formatting at debug level: this sits on the hot path of
+                # every batched call, the string must not be built when disabled
+                self.logger.debug(
+                    'batching enabled for %s(). batch_size=%s\tnum_batch=%s\taxis=%s',
+                    func.__qualname__, b_size, num_batch, iter_axis)
 
             total_size1 = get_size(data, iter_axis)
             total_size2 = b_size * num_batch if num_batch else None
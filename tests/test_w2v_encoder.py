@@ -1,6 +1,10 @@
 import os
+import shutil
+import tempfile
 import unittest
 
+import numpy as np
+
 from gnes.encoder.text.w2v import Word2VecEncoder
 
 
@@ -37,3 +41,80 @@ class TestW2vEncoder(unittest.TestCase):
     def tearDown(self):
         if os.path.exists(self.dump_path):
             os.remove(self.dump_path)
+
+
+class TestW2vEncoderSynthetic(unittest.TestCase):
+    """Tests against a small synthetic vectors file, no WORD2VEC_MODEL needed"""
+
+    words = {
+        'hello': [1., 2., 3.],
+        'world': [4., 5., 6.],
+        '你好': [-1., 0., 1.],
+        '天气': [2., -2., 4.],
+    }
+    dim = 3
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.tmp_dir, 'vec.txt')
+        with open(self.model_path, 'w', encoding='utf8') as f:
+            f.write('%d %d\n' % (len(self.words), self.dim))
+            for w, v in self.words.items():
+                f.write('%s %s\n' % (w, ' '.join(str(i) for i in v)))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_text_vs_bin_parity(self):
+        # first instance parses text and writes the binary cache, second one
+        # memory-maps it; both must produce identical vectors
+        first = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim)
+        vec1 = first.encode(['hello', '你好 天气'])
+        self.assertTrue(os.path.exists(self.model_path + '.npy'))
+        self.assertTrue(os.path.exists(self.model_path + '.vocab'))
+        second = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim)
+        self.assertIsInstance(second.embeddings, np.memmap)
+        np.testing.assert_allclose(second.encode(['hello', '你好 天气']), vec1, rtol=1e-5)
+
+    def test_oov_and_empty_pooling(self):
+        encoder = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim)
+        vec = encoder.encode(['hello', 'qqqzzz', ''])
+        np.testing.assert_allclose(vec[0], self.words['hello'], rtol=1e-5)
+        # fully out-of-vocab and empty sentences both pool to the zero vector
+        np.testing.assert_allclose(vec[1], np.zeros(self.dim), atol=1e-6)
+        np.testing.assert_allclose(vec[2], np.zeros(self.dim), atol=1e-6)
+
+    def test_lru_cache_hit(self):
+        encoder = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim, cache_size=2)
+        vec1 = encoder.encode(['hello', '你好', 'world'])
+        self.assertEqual(len(encoder._cache), 2)  # evicted down to the cap
+        np.testing.assert_allclose(encoder.encode(['hello', '你好', 'world']), vec1, rtol=1e-5)
+        encoder.clear_cache()
+        self.assertEqual(len(encoder._cache), 0)
+        np.testing.assert_allclose(encoder.encode(['hello', '你好', 'world']), vec1, rtol=1e-5)
+
+    def test_quantize_tolerance(self):
+        ref = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim)
+        quant = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim, quantize=True)
+        self.assertIsNone(quant.embeddings)
+        self.assertEqual(quant.q_emb.dtype, np.int8)
+        sents = ['hello world', '你好', '天气 你好 hello']
+        np.testing.assert_allclose(quant.encode(sents), ref.encode(sents), atol=0.05)
+
+    def test_bucket_order_preserved(self):
+        sents = ['hello world hello', 'world', '', '你好 天气', 'hello', '天气 天气 天气 hello']
+        plain = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim,
+                                bucket_size=0, cache_size=0)
+        bucketed = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim,
+                                   bucket_size=2, cache_size=0)
+        np.testing.assert_allclose(bucketed.encode(sents), plain.encode(sents), rtol=1e-5)
+
+    def test_parallel_tokenize(self):
+        # regression: the pool must survive a parent that already started the
+        # numba parallel runtime during post_init warmup
+        encoder = Word2VecEncoder(model_dir=self.model_path, dimension=self.dim,
+                                  tokenize_workers=2, parallel_tokenize_threshold=4)
+        vec = encoder.encode(['hello'] * 8)
+        self.assertEqual(vec.shape, (8, self.dim))
+        np.testing.assert_allclose(vec, [self.words['hello']] * 8, rtol=1e-5)
+        encoder.close()